@@ -0,0 +1,8 @@
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file once per process
+load_dotenv()
+
+GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+GOOGLE_CUSTOM_SEARCH_CX = os.getenv('GOOGLE_CUSTOM_SEARCH_CX')
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
 from core.query_parser import parse_query, create_prompt
 from core.data_fetcher import fetch_leads
 #from core.lead_ranker import rank_leads
@@ -7,7 +8,8 @@ router = APIRouter()
 
 @router.post("/find_leads")
 async def find_leads(user_query: str):
-    structured_query = parse_query(user_query)
+    # parse_query makes a blocking OpenAI call; keep it off the event loop
+    structured_query = await run_in_threadpool(parse_query, user_query)
     raw_leads = fetch_leads(structured_query)
 #    ranked_leads = rank_leads(raw_leads)
     return {"leads": raw_leads}
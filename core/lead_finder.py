@@ -1,5 +1,6 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import asyncio
+from urllib.parse import urlparse
 from services.linkedin_scraper import LinkedInScraper
 from services.email_validator import EmailValidator
 from core.query_parser import (
@@ -8,35 +9,52 @@ from core.query_parser import (
     create_linkedin_search_query,
     guess_email_format
 )
-import random
+
+# Cap on concurrent LinkedIn searches across all companies and roles
+MAX_CONCURRENT_SEARCHES = 8
+# Cap on email validation checks in flight at once; mail servers rate-limit
+MAX_CONCURRENT_EMAIL_CHECKS = 10
 
 class LeadFinder:
     def __init__(self):
         self.linkedin_scraper = LinkedInScraper()
         self.email_validator = EmailValidator()
+        self._search_semaphore = asyncio.BoundedSemaphore(MAX_CONCURRENT_SEARCHES)
+        self._email_semaphore = asyncio.BoundedSemaphore(MAX_CONCURRENT_EMAIL_CHECKS)
 
     async def find_leads(self, user_query: str) -> Dict:
         # Step 1: Parse the query
-        query_components = parse_query(user_query)
+        query_components = await self._parse_query(user_query)
         
         # Step 2: Find matching companies
         company_prompt = create_company_search_prompt(query_components['company_profile'])
         companies = await self._search_companies(company_prompt)
         
         # Step 3: Find LinkedIn profiles for each company
-        leads = []
-        for company in companies:
-            company_leads = await self._find_company_leads(
-                company, 
-                query_components['decision_makers']
-            )
-            leads.extend(company_leads)
+        company_leads = await asyncio.gather(*[
+            self._find_company_leads(company, query_components['decision_makers'])
+            for company in companies
+        ])
+        leads = [lead for leads_for_company in company_leads for lead in leads_for_company]
         
         # Step 4: Validate emails
         validated_leads = await self._validate_lead_emails(leads)
         
         return validated_leads
 
+    async def close(self) -> None:
+        """
+        Release HTTP connections held by the underlying scraper
+        """
+        await self.linkedin_scraper.close()
+
+    async def _parse_query(self, user_query: str) -> Dict:
+        """
+        Run parse_query in a worker thread; it caches and coalesces
+        duplicate queries itself
+        """
+        return await asyncio.to_thread(parse_query, user_query)
+
     async def _search_companies(self, prompt: str) -> List[Dict]:
         """
         Use GPT with web search to find matching companies
@@ -48,45 +66,115 @@ class LeadFinder:
         """
         Find LinkedIn profiles for each decision maker role using scraping
         """
-        leads = []
-        for role in decision_makers:
+        company_domain = _extract_domain(company['website'])
+        role_leads = await asyncio.gather(*[
+            self._find_role_leads(company, company_domain, role)
+            for role in decision_makers
+        ])
+        return [lead for leads_for_role in role_leads for lead in leads_for_role]
+
+    async def _find_role_leads(self, company: Dict, company_domain: str, role: str) -> List[Dict]:
+        """
+        Find LinkedIn profiles for a single decision maker role at a company
+        """
+        async with self._search_semaphore:
             profiles = await self.linkedin_scraper.search_profiles(
                 company_name=company['name'],
                 job_title=role,
                 limit=3
             )
-            
-            for profile in profiles:
-                leads.append({
-                    'name': profile['name'],
-                    'linkedin_url': profile['profile_url'],
-                    'company': company['name'],
-                    'company_website': company['website'],
-                    'role': role,
-                    'headline': profile.get('headline', ''),
-                    'location': profile.get('location', '')
-                })
-            
-            # Add delay between searches to avoid detection
-            await asyncio.sleep(random.uniform(2, 5))
         
-        return leads
+        return [
+            {
+                'name': profile['name'],
+                'linkedin_url': profile['profile_url'],
+                'company': company['name'],
+                'company_website': company['website'],
+                'company_domain': company_domain,
+                'role': role,
+                'headline': profile.get('headline', ''),
+                'location': profile.get('location', '')
+            }
+            for profile in profiles
+        ]
 
     async def _validate_lead_emails(self, leads: List[Dict]) -> List[Dict]:
         """
         Validate and add email addresses to leads
         """
+        # Leads sharing a name and domain resolve to the same address
+        lookups = {}
+        lead_keys = []
         for lead in leads:
             name_parts = lead['name'].split()
             first_name = name_parts[0]
             last_name = name_parts[-1]
-            domain = lead['company_website'].split('www.')[-1]
-            
-            email_formats = guess_email_format(first_name, last_name, domain)
+            domain = lead['company_domain']
+            if not domain:
+                # No domain to build addresses on; skip the SMTP probes
+                lead_keys.append(None)
+                continue
             
-            for email in email_formats[:3]:  # Try up to 3 formats
-                if await self.email_validator.is_valid(email):
-                    lead['email'] = email
-                    break
+            key = (first_name.lower(), last_name.lower(), domain)
+            if key not in lookups:
+                lookups[key] = self._find_valid_email(first_name, last_name, domain)
+            lead_keys.append(key)
         
-        return leads
\ No newline at end of file
+        # A failed lookup means no email for those leads; it must not abort the
+        # batch while the other lookups are still probing
+        results = await asyncio.gather(*lookups.values(), return_exceptions=True)
+        resolved = {
+            key: email for key, email in zip(lookups, results)
+            if isinstance(email, str)
+        }
+        for lead, key in zip(leads, lead_keys):
+            if resolved.get(key):
+                lead['email'] = resolved[key]
+        
+        return leads
+
+    async def _find_valid_email(self, first_name: str, last_name: str, domain: str) -> Optional[str]:
+        """
+        Check the most likely email formats concurrently and return the
+        first valid one in format order, cancelling lower-priority checks
+        as soon as a higher-priority format is confirmed
+        """
+        email_formats = list(dict.fromkeys(guess_email_format(first_name, last_name, domain)))
+        candidates = email_formats[:3]  # Try up to 3 formats
+        
+        checks = [
+            asyncio.ensure_future(self._check_email(email))
+            for email in candidates
+        ]
+        try:
+            for email, check in zip(candidates, checks):
+                if await check:
+                    return email
+            return None
+        finally:
+            for check in checks:
+                if not check.done():
+                    check.cancel()
+                elif not check.cancelled():
+                    check.exception()  # mark a failed, unneeded check as seen
+
+    async def _check_email(self, email: str) -> bool:
+        """
+        Validate one address, holding a slot of the global SMTP check cap
+        """
+        async with self._email_semaphore:
+            return await self.email_validator.is_valid(email)
+
+
+def _extract_domain(website: str) -> str:
+    """
+    Reduce a company website ("https://www.acme.com/about") to its bare domain.
+    Returns '' when no usable host can be parsed.
+    """
+    try:
+        parsed = urlparse(website if '://' in website else f'//{website}')
+        domain = (parsed.hostname or '').lower()
+    except ValueError:
+        # Malformed URLs such as "http://[bad" must not abort the whole search
+        return ''
+    return domain[4:] if domain.startswith('www.') else domain
@@ -1,56 +1,145 @@
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Dict, List
 import openai
 from pydantic import BaseModel
 
+PARSE_QUERY_SYSTEM_PROMPT = """
+You are a B2B sales assistant. Analyze the user's company targeting criteria and:
+1. Extract the company profile/characteristics they're looking for
+2. Identify or suggest relevant decision maker roles
+
+Return ONLY a JSON with two fields:
+- company_profile: string describing target company characteristics
+- decision_makers: list of job titles for key decision makers
+"""
+
+COMPANY_SEARCH_PROMPT_TEMPLATE = """
+Search the web and find 10 companies that match this profile: {company_profile}
+
+For each company, provide:
+1. Company name
+2. Website URL
+3. Brief description
+4. Keywords/tags
+
+Return the results as a JSON list.
+"""
+
 class QueryComponents(BaseModel):
     company_profile: str
     decision_makers: List[str]
 
+# parse_query completions keyed on normalize_query; parse_query runs in
+# worker threads, so access goes through the lock. Requests still waiting on
+# GPT are tracked too, so concurrent duplicates share one call.
+PARSE_CACHE_MAX_ENTRIES = 512
+_parse_cache: "OrderedDict[str, str]" = OrderedDict()
+_inflight_parses: Dict[str, Future] = {}
+_parse_cache_lock = threading.Lock()
+
 def parse_query(user_input: str) -> Dict:
     """
     Use GPT to parse user input into company profile and decision maker roles.
     Returns a structured JSON with these components.
     """
-    system_prompt = """
-    You are a B2B sales assistant. Analyze the user's company targeting criteria and:
-    1. Extract the company profile/characteristics they're looking for
-    2. Identify or suggest relevant decision maker roles
-    
-    Return ONLY a JSON with two fields:
-    - company_profile: string describing target company characteristics
-    - decision_makers: list of job titles for key decision makers
+    # The cache only holds completions that decoded to valid QueryComponents
+    return json.loads(_cached_parse_completion(user_input))
+
+def normalize_query(user_input: str) -> str:
+    """
+    Collapse whitespace and case so equivalent queries share a cache entry
+    """
+    return " ".join(user_input.split()).casefold()
+
+def _cached_parse_completion(user_input: str) -> str:
     """
+    LRU cache in front of the GPT call; failures raise and are not cached.
+    Only the cache key is case-folded, the model sees the user's own casing.
+    Concurrent calls for the same key wait on the first one's request.
+    """
+    key = normalize_query(user_input)
+    with _parse_cache_lock:
+        if key in _parse_cache:
+            _parse_cache.move_to_end(key)
+            return _parse_cache[key]
+        pending = _inflight_parses.get(key)
+        is_owner = pending is None
+        if is_owner:
+            pending = _inflight_parses[key] = Future()
+    
+    if not is_owner:
+        return pending.result()
+    
+    try:
+        content = _request_parse_completion(" ".join(user_input.split()))
+    except BaseException as e:
+        with _parse_cache_lock:
+            _inflight_parses.pop(key, None)
+        pending.set_exception(e)
+        raise
     
+    with _parse_cache_lock:
+        _parse_cache[key] = content
+        _parse_cache.move_to_end(key)
+        if len(_parse_cache) > PARSE_CACHE_MAX_ENTRIES:
+            _parse_cache.popitem(last=False)
+        _inflight_parses.pop(key, None)
+    pending.set_result(content)
+    return content
+
+def _request_parse_completion(user_input: str) -> str:
+    """
+    Ask GPT to parse the targeting criteria and return the completion as
+    JSON text validated against QueryComponents, with any markdown code
+    fence removed
+    """
     user_prompt = f"Parse this sales targeting criteria: {user_input}"
     
     try:
         response = openai.ChatCompletion.create(
             model="gpt-4",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": PARSE_QUERY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0.2
+            temperature=0,
+            max_tokens=512
         )
-        return response.choices[0].message.content
     except Exception as e:
-        raise Exception(f"Error parsing query: {str(e)}")
+        raise Exception(f"Error parsing query: {str(e)}") from e
+    
+    content = _strip_code_fence(response.choices[0].message.content)
+    try:
+        components = json.loads(content)
+    except ValueError as e:
+        raise Exception(f"Error parsing query: model returned invalid JSON ({str(e)})") from e
+    
+    # Callers index company_profile and decision_makers, so check the shape too
+    if not isinstance(components, dict):
+        raise Exception("Error parsing query: model returned JSON that is not an object")
+    try:
+        QueryComponents(**components)
+    except ValueError as e:
+        raise Exception(f"Error parsing query: model returned unexpected fields ({str(e)})") from e
+    return content
+
+def _strip_code_fence(text: str) -> str:
+    """
+    Remove a leading ```/```json fence and a trailing ``` fence, if present
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.removeprefix("```json").removeprefix("```")
+    return text.removesuffix("```").strip()
 
 def create_company_search_prompt(company_profile: str) -> str:
     """
     Create a prompt for GPT to search for companies matching the profile.
     """
-    return f"""
-    Search the web and find 10 companies that match this profile: {company_profile}
-    
-    For each company, provide:
-    1. Company name
-    2. Website URL
-    3. Brief description
-    4. Keywords/tags
-    
-    Return the results as a JSON list.
-    """
+    return COMPANY_SEARCH_PROMPT_TEMPLATE.format(company_profile=company_profile)
 
 def create_linkedin_search_query(company_name: str, job_title: str) -> str:
     """
@@ -1,51 +1,127 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import aiohttp
-import os
+import asyncio
+import random
+import time
 from urllib.parse import quote
-from dotenv import load_dotenv
+from app import config
 
-# Load environment variables from .env file
-load_dotenv()
+# Profile search results are reused for a day; bounded to keep memory flat
+PROFILE_CACHE_TTL_SECONDS = 24 * 60 * 60
+PROFILE_CACHE_MAX_ENTRIES = 1024
 
 class LinkedInScraper:
-    def __init__(self):
-        self.google_api_key = os.getenv('GOOGLE_API_KEY')
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        google_api_key: Optional[str] = None,
+        google_cx: Optional[str] = None
+    ):
+        self.google_api_key = google_api_key or config.GOOGLE_API_KEY
         if not self.google_api_key:
             raise ValueError("GOOGLE_API_KEY environment variable is not set")
             
-        self.google_cx = os.getenv('GOOGLE_CUSTOM_SEARCH_CX')
+        self.google_cx = google_cx or config.GOOGLE_CUSTOM_SEARCH_CX
         if not self.google_cx:
             raise ValueError("GOOGLE_CUSTOM_SEARCH_CX environment variable is not set")
             
         self.search_url = "https://www.googleapis.com/customsearch/v1"
+        self._profile_cache: Dict[Tuple[str, str, int], Tuple[float, List[Dict]]] = {}
+        # A caller-supplied session is shared and left open on close()
+        self._session = session
+        self._owns_session = session is None
+        self._search_pacing_lock = asyncio.Lock()
+        self._next_search_at = 0.0
 
     async def search_profiles(self, company_name: str, job_title: str, limit: int = 3) -> List[Dict]:
         """
         Use Google Custom Search API to find LinkedIn profiles
         """
+        cache_key = (company_name.lower(), job_title.lower(), limit)
+        cached = self._get_cached_profiles(cache_key)
+        if cached is not None:
+            return cached
+        
         search_query = f'site:linkedin.com/in/ "{company_name}" "{job_title}"'
         
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'key': self.google_api_key,
-                    'cx': self.google_cx,
-                    'q': search_query,
-                    'num': min(limit, 10)  # Google API allows max 10 results per query
-                }
-                
-                async with session.get(self.search_url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_google_results(data)
-                    else:
-                        print(f"Google API request failed with status: {response.status}")
-                        return []
+            await self._wait_for_search_slot()
+            # A concurrent caller may have fetched the same search while we waited
+            cached = self._get_cached_profiles(cache_key)
+            if cached is not None:
+                return cached
+            
+            session = self._get_session()
+            params = {
+                'key': self.google_api_key,
+                'cx': self.google_cx,
+                'q': search_query,
+                'num': min(limit, 10)  # Google API allows max 10 results per query
+            }
+            
+            async with session.get(self.search_url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    profiles = self._parse_google_results(data)
+                    self._cache_profiles(cache_key, profiles)
+                    return profiles
+                else:
+                    print(f"Google API request failed with status: {response.status}")
+                    return []
                         
         except Exception as e:
             print(f"Error during Google API search: {str(e)}")
             return []
 
+    async def _wait_for_search_slot(self) -> None:
+        """
+        Space Google searches 2-5 seconds apart across all concurrent
+        callers to avoid detection; cache hits never wait here
+        """
+        async with self._search_pacing_lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_search_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_search_at = loop.time() + random.uniform(2, 5)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Lazily create one keep-alive session reused across searches
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the HTTP session if this scraper created it
+        """
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def _get_cached_profiles(self, cache_key: Tuple[str, str, int]) -> Optional[List[Dict]]:
+        """
+        Return a cached search result that is still within its TTL
+        """
+        cached = self._profile_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < PROFILE_CACHE_TTL_SECONDS:
+            return cached[1]
+        return None
+
+    def _cache_profiles(self, cache_key: Tuple[str, str, int], profiles: List[Dict]) -> None:
+        """
+        Store a successful search result, evicting the oldest entry when full
+        """
+        self._profile_cache.pop(cache_key, None)
+        if len(self._profile_cache) >= PROFILE_CACHE_MAX_ENTRIES:
+            self._profile_cache.pop(next(iter(self._profile_cache)))
+        self._profile_cache[cache_key] = (time.monotonic(), profiles)
+
     def _parse_google_results(self, data: Dict) -> List[Dict]:
         """
         Parse Google Custom Search API results to extract LinkedIn profiles
@@ -59,16 +135,16 @@ class LinkedInScraper:
             if 'linkedin.com/in/' in item['link']:
                 # Extract name from title - Google API returns cleaner titles
                 # Usually format: "First Last - Title at Company | LinkedIn"
-                title_parts = item['title'].split(' - ')
-                name = title_parts[0].strip()
+                name, separator, rest = item['title'].partition(' - ')
+                headline = rest.partition(' - ')[0].partition(' | ')[0] if separator else ''
                 
                 # Extract any additional info from snippet
                 snippet = item.get('snippet', '')
                 
                 profile = {
-                    'name': name,
+                    'name': name.strip(),
                     'profile_url': item['link'],
-                    'headline': title_parts[1].split(' | ')[0] if len(title_parts) > 1 else '',
+                    'headline': headline,
                     'summary': snippet
                 }
                 